@@ -0,0 +1,10 @@
+# Production entrypoint: gunicorn main:app
+# One uvicorn event loop per worker process; uvloop/httptools are picked up
+# automatically since uvicorn[standard] is installed.
+import multiprocessing
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn_worker.UvicornWorker"
+keepalive = 5
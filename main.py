@@ -1,48 +1,121 @@
+import hashlib
+import logging
 import os
+import time
 import uuid
+from typing import Any
+from functools import lru_cache
+from contextlib import asynccontextmanager
+import httpx
+import orjson
+from cachetools import TTLCache
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse, PlainTextResponse, Response
 from fastapi import Request
-from pydantic import BaseModel, Field
-from supabase import create_client, Client
+from pydantic import BaseModel, Field, ValidationError
+from supabase import AsyncClient, AsyncClientOptions, acreate_client
 from dotenv import load_dotenv
 from clerk_backend_api import AuthenticateRequestOptions, Clerk
 import uvicorn
 import boto3
 
 
-
-app = FastAPI()
-
 load_dotenv()
 
-clerk_client = Clerk(bearer_auth=os.getenv('CLERK_SECRET_KEY'))
+logger = logging.getLogger(__name__)
+
 ALLOWED_ORIGINS = os.getenv('ALLOWED_ORIGINS', 'http://localhost:3000').split(',')
 
 if not os.getenv("SUPABASE_API_URL") or not os.getenv("SUPABASE_SERVICE_KEY"):
     raise ValueError("SUPABASE_API_URL and SUPABASE_SERVICE_KEY must be set")
 
-
-supabase: Client = create_client(
-    os.getenv("SUPABASE_API_URL"),
-    os.getenv("SUPABASE_SERVICE_KEY"),
+# Bound on the single per-worker connection pool to Supabase (PostgREST, RPC and
+# GraphQL all share it). Lower these when adding workers so
+# workers * SUPABASE_MAX_CONNECTIONS stays under the project's pool size.
+SUPABASE_HTTP_LIMITS = httpx.Limits(
+    max_connections=int(os.getenv("SUPABASE_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("SUPABASE_MAX_KEEPALIVE_CONNECTIONS", "20")),
+    keepalive_expiry=float(os.getenv("SUPABASE_KEEPALIVE_EXPIRY", "30")),
 )
+SUPABASE_HTTP_TIMEOUT = httpx.Timeout(30.0, pool=10.0)
+
+
+@lru_cache(maxsize=1)
+def get_clerk() -> Clerk:
+    return Clerk(bearer_auth=os.getenv('CLERK_SECRET_KEY'))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One pooled HTTP client per worker process so DB calls reuse keep-alive
+    # connections instead of blocking a threadpool thread per request
+    app.state.http = httpx.AsyncClient(
+        http2=True,
+        limits=SUPABASE_HTTP_LIMITS,
+        timeout=SUPABASE_HTTP_TIMEOUT,
+    )
+    app.state.supabase = await acreate_client(
+        os.getenv("SUPABASE_API_URL"),
+        os.getenv("SUPABASE_SERVICE_KEY"),
+        options=AsyncClientOptions(httpx_client=app.state.http),
+    )
+    yield
+    await app.state.http.aclose()
+
 
 app = FastAPI(
     title="AI Engineering API",
     description="Backend API for Six-Figure AI Engineering application",
     version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
+async def get_async_supabase(request: Request) -> AsyncClient:
+    return request.app.state.supabase
+
+
+async def get_http(request: Request) -> httpx.AsyncClient:
+    return request.app.state.http
+
+
+_GRAPHQL_URL = f"{os.getenv('SUPABASE_API_URL')}/graphql/v1"
+_GRAPHQL_HEADERS = {
+    "apikey": os.getenv("SUPABASE_SERVICE_KEY"),
+    "Authorization": f"Bearer {os.getenv('SUPABASE_SERVICE_KEY')}",
+}
+
+
+async def supabase_graphql(http: httpx.AsyncClient, query: str, variables: dict) -> dict:
+    """
+    Run a query against Supabase's pg_graphql endpoint and return its data
+    """
+    response = await http.post(
+        _GRAPHQL_URL,
+        json={"query": query, "variables": variables},
+        headers=_GRAPHQL_HEADERS,
+    )
+    response.raise_for_status()
+    body = response.json()
+    if body.get("errors"):
+        raise RuntimeError(body["errors"][0]["message"])
+    return body["data"]
+
+
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
 )
 
+app.add_middleware(GZipMiddleware, minimum_size=500, compresslevel=1)
+
 s3_client = boto3.client(
     "s3",
     endpoint_url=os.getenv("AWS_ENDPOINT_URL_S3"),
@@ -53,93 +126,121 @@ s3_client = boto3.client(
 
 BUCKET_NAME=os.getenv("S3_BUCKET_NAME")
 
+# Constant bodies are serialized once at import instead of on every request
+_ROOT = Response(
+    content=orjson.dumps({"message": "Six-Figure AI Engineering app is running!"}),
+    media_type="application/json",
+)
+
 @app.get("/")
 async def root():
-    return {"message": "Six-Figure AI Engineering app is running!"}
+    return _ROOT
 
-@app.get("/health")
+# Built once at import; load balancers poll this many times per second
+_HEALTH = PlainTextResponse("OK", headers={"cache-control": "no-store"})
+
+@app.get("/health", response_class=PlainTextResponse)
 async def health_check():
-    return {"status": "healthy", "version": "1.0.0"}
+    return _HEALTH
+
+class ClerkUserData(BaseModel):
+    id: str = Field(..., min_length=1, description="The Clerk user id")
 
-@app.post("/api/users/webhook")
-async def create_user_from_clerk_webhook(clerk_webhook_data: dict):
+class ClerkWebhook(BaseModel):
+    type: str
+    # Shape depends on the event type; only user.created payloads are validated
+    data: Any = None
+
+
+def _ignored_event_response(event_type: str) -> Response:
+    return Response(
+        content=orjson.dumps({
+            "success": True,
+            "message": f"Event type '{event_type}' ignored"
+        }),
+        media_type="application/json",
+    )
+
+# Clerk events we subscribe to but don't act on
+_IGNORED_EVENTS = {
+    event_type: _ignored_event_response(event_type)
+    for event_type in (
+        "user.updated",
+        "user.deleted",
+        "session.created",
+        "session.ended",
+        "session.removed",
+        "session.revoked",
+        "email.created",
+        "sms.created",
+    )
+}
+
+
+@app.post("/api/users/webhook", response_class=ORJSONResponse)
+async def create_user_from_clerk_webhook(
+    clerk_webhook_data: ClerkWebhook,
+    db: AsyncClient = Depends(get_async_supabase)
+):
     """
     Handle Clerk user.created webhook event
     
     Logic Flow:
-    1. Validate webhook payload structure
-    2. Check event type (only process user.created)
-    3. Extract and validate clerk_id
-    4. Check for duplicate users (webhooks can be retried)
-    5. Create new user in database
-    6. Return success response
+    1. Check event type (only process user.created)
+    2. Validate user data and clerk_id with the ClerkUserData model
+    3. Check for duplicate users (webhooks can be retried)
+    4. Create new user in database
+    5. Return success response
     """
     try:
-        # Step 1: Validate webhook payload structure
-        if not isinstance(clerk_webhook_data, dict):
-            raise HTTPException(
-                status_code=400, 
-                detail="Invalid webhook payload format"
-            )
-        
-        # Step 2: Check event type
-        event_type = clerk_webhook_data.get("type")
+        # Step 1: Check event type
+        event_type = clerk_webhook_data.type
         if event_type != "user.created":
             # Return success for other events (don't retry)
-            return {
-                "success": True,
-                "message": f"Event type '{event_type}' ignored"
-            }
-        
-        # Step 3: Extract and validate user data
-        user_data = clerk_webhook_data.get("data")
-        if not user_data or not isinstance(user_data, dict):
-            raise HTTPException(
-                status_code=400,
-                detail="Missing or invalid user data in webhook payload"
-            )
-        
-        # Step 4: Extract and validate clerk_id
-        clerk_id = user_data.get("id")
-        if not clerk_id or not isinstance(clerk_id, str):
+            return _IGNORED_EVENTS.get(event_type) or _ignored_event_response(event_type)
+
+        try:
+            clerk_id = ClerkUserData.model_validate(clerk_webhook_data.data).id
+        except ValidationError:
             raise HTTPException(
                 status_code=400, 
                 detail="Missing or invalid clerk_id in user data"
             )
         
-        # Step 5: Check if user already exists (webhook idempotency)
-        existing_user = (
-            supabase.table("users")
+        # Step 2: Check if user already exists (webhook idempotency)
+        existing_user = await (
+            db.table("users")
             .select("clerk_id")
             .eq("clerk_id", clerk_id)
+            .limit(1)
             .execute()
         )
         
         if existing_user.data:
             # User already exists - return success (don't retry webhook)
-            return {
+            return ORJSONResponse({
                 "success": True,
                 "message": "User already exists",
                 "clerk_id": clerk_id
-            }
+            })
         
-        # Step 6: Create new user in database
-        result = supabase.table("users").insert({
+        # Step 3: Create new user in database
+        result = await db.table("users").insert({
             "clerk_id": clerk_id
         }).execute()
         
-        # Step 7: Verify insertion was successful
+        # Step 4: Verify insertion was successful
         if not result.data:
             raise HTTPException(
                 status_code=500, 
                 detail="Failed to create user in database"
             )
         
-        return {
+        return ORJSONResponse({
             "success": True,
             "message": "User created successfully",
             "user": result.data[0]
-        }
+        })
         
     except HTTPException:
         raise
@@ -151,23 +252,41 @@ async def create_user_from_clerk_webhook(clerk_webhook_data: dict):
         )
 
 
+# Verified Clerk sessions keyed by a hash of the bearer token, so the JWT
+# signature check only runs once per token instead of on every request
+_auth_cache: TTLCache = TTLCache(maxsize=10_000, ttl=300)
+
+_AUTH_OPTS = AuthenticateRequestOptions(authorized_parties=ALLOWED_ORIGINS)
+
+
 async def get_current_user(request: Request) -> str: 
     try:
-
-        request_state = clerk_client.authenticate_request(
-            request,
-            AuthenticateRequestOptions(
-                authorized_parties=["http://localhost:3000"]
-            )
+        scheme, _, token = request.headers.get("authorization", "").partition(" ")
+        cache_key = (
+            hashlib.blake2b(token.encode(), digest_size=16).digest()
+            if scheme.lower() == "bearer" and token
+            else None
         )
+
+        if cache_key is not None:
+            cached = _auth_cache.get(cache_key)
+            if cached is not None:
+                clerk_id, exp = cached
+                if exp > time.time():
+                    return clerk_id
+                _auth_cache.pop(cache_key, None)
+
+        request_state = get_clerk().authenticate_request(request, _AUTH_OPTS)
         
         if not request_state.is_signed_in:
             raise HTTPException(status_code=401, detail="Not authenticated")
         
         clerk_id = request_state.payload.get("sub")
-        print(clerk_id)
         if not clerk_id:
             raise HTTPException(status_code=401, detail="Invalid token")
+
+        if cache_key is not None:
+            _auth_cache[cache_key] = (clerk_id, request_state.payload.get("exp", 0))
         
         return clerk_id
         
@@ -178,9 +297,12 @@ async def get_current_user(request: Request) -> str:
         ) 
 
 @app.get("/api/projects")
-def get_projects(clerk_id: str =Depends(get_current_user)):
+async def get_projects(
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)
+):
     try:
-        result = supabase.table('projects').select('*').eq('clerk_id', clerk_id).execute()
+        result = await db.table('projects').select('*').eq('clerk_id', clerk_id).execute()
 
         return{
             "message": "Projects retrieved successfully",
@@ -223,24 +345,25 @@ class ProjectSettings(BaseModel):
     vector_weight: float
     keyword_weight: float
 
-@app.post("/api/projects") 
-def create_project(project: ProjectCreate, clerk_id: str = Depends(get_current_user)):
-    print(clerk_id)
+@app.post("/api/projects", response_class=ORJSONResponse)
+async def create_project(
+    project: ProjectCreate,
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)
+):
     """
     Create a new project with default settings
     
     Logic Flow:
-    1. Insert new project into database
-    2. Create default project settings
-    3. If settings creation fails, rollback project creation
-    4. Return created project
+    1. Insert project and default settings in one transaction (create_project_with_defaults RPC)
+    2. Return created project
     """
     try:
-        # Step 1: Insert new project into database
-        project_result = supabase.table("projects").insert({
-            "name": project.name, 
-            "description": project.description,
-            "clerk_id": clerk_id
+        # Step 1: Insert project + default settings server-side; any failure rolls back both
+        project_result = await db.rpc("create_project_with_defaults", {
+            "_name": project.name, 
+            "_description": project.description,
+            "_clerk_id": clerk_id
         }).execute()
 
         if not project_result.data:
@@ -250,37 +373,12 @@ def create_project(project: ProjectCreate, clerk_id: str = Depends(get_current_u
             )
 
         created_project = project_result.data[0]
-        project_id = created_project["id"]
-
-        # Step 2: Create default settings for the project 
-        settings_result = supabase.table("project_settings").insert({
-            "project_id": project_id, 
-            "embedding_model": "text-embedding-3-large",
-            "rag_strategy": "basic",
-            "agent_type": "agentic",
-            "chunks_per_search": 10,
-            "final_context_size": 5,
-            "similarity_threshold": 0.3,
-            "number_of_queries": 5,
-            "reranking_enabled": True,
-            "reranking_model": "rerank-english-v3.0",
-            "vector_weight": 0.7,
-            "keyword_weight": 0.3,
-        }).execute()
 
-        if not settings_result.data:
-            # Step 3: Rollback - Delete the project if settings creation fails
-            supabase.table("projects").delete().eq("id", project_id).execute()
-            raise HTTPException(
-                status_code=422, 
-                detail="Failed to create project settings - project creation rolled back"
-            )
-
-        return {
+        return ORJSONResponse({
             "success": True,
             "message": "Project created successfully", 
             "data": created_project 
-        }
+        })
 
     except HTTPException:
         raise
@@ -291,42 +389,37 @@ def create_project(project: ProjectCreate, clerk_id: str = Depends(get_current_u
         )
 
 
-@app.delete("/api/projects/{project_id}")
-def delete_project(
+@app.delete("/api/projects/{project_id}", response_class=ORJSONResponse)
+async def delete_project(
     project_id: str, 
-    clerk_id: str = Depends(get_current_user)
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)
 ):
     """
     Delete a project and all related data
     
     Logic Flow:
-    1. Verify project exists and belongs to user
-    2. Delete project (CASCADE handles all related data: settings, documents, chunks, chats, messages)
+    1. Delete project owned by user (CASCADE handles all related data: settings, documents, chunks, chats, messages)
+    2. An empty result means the project doesn't exist or belongs to someone else
     """
     try:
-        # Step 1: Verify project exists and belongs to user 
-        project_result = supabase.table("projects").select("*").eq("id", project_id).eq("clerk_id", clerk_id).execute()
-
-        if not project_result.data: 
-            raise HTTPException(
-                status_code=404, 
-                detail="Project not found or you don't have permission to delete it"
-            )
-
-        # Step 2: Delete project (CASCADE handles all related data)
-        deleted_result = supabase.table("projects").delete().eq("id", project_id).eq("clerk_id", clerk_id).execute()
+        # Step 1: Delete project (CASCADE handles all related data)
+        deleted_result = await db.table("projects").delete().eq("id", project_id).eq("clerk_id", clerk_id).execute()
 
+        # Step 2: Nothing deleted - missing or not owned by user
         if not deleted_result.data: 
             raise HTTPException(
                 status_code=404, 
-                detail="Failed to delete project - project not found"
+                detail="Project not found or you don't have permission to delete it"
             )
+        _settings_cache.pop((project_id, clerk_id), None)
+        _chats_cache.pop((project_id, clerk_id), None)
 
-        return {
+        return ORJSONResponse({
             "success": True,
             "message": "Project deleted successfully", 
             "data": deleted_result.data[0]  
-        }
+        })
 
     except HTTPException:
         raise
@@ -340,13 +433,14 @@ def delete_project(
 @app.get("/api/projects/{project_id}")
 async def get_project(
     project_id: str, 
-    clerk_id: str = Depends(get_current_user)
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)
 ):
     """
     Retrieve a specific project by ID
     """
     try:
-        result = supabase.table("projects").select("*").eq("id", project_id).eq("clerk_id", clerk_id).execute()
+        result = await db.table("projects").select("*").eq("id", project_id).eq("clerk_id", clerk_id).execute()
 
         if not result.data:
             raise HTTPException(
@@ -369,22 +463,70 @@ async def get_project(
         )
 
 
+# Short-lived per-worker copies of read-mostly data, dropped by the routes that
+# write it; both are keyed by (project_id, clerk_id) -> (etag, data)
+_settings_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+_chats_cache: TTLCache = TTLCache(maxsize=1024, ttl=30)
+
+
+def _etag(data: bytes) -> str:
+    # Weak: GZipMiddleware may send the same representation gzip- or identity-encoded
+    return 'W/"' + hashlib.blake2b(data, digest_size=8).hexdigest() + '"'
+
+
+def _etag_response(request: Request, etag: str, content: dict) -> Response:
+    """
+    Return 304 with no body when the client already holds this version
+    """
+    headers = {"etag": etag, "cache-control": "private, no-cache"}
+    # If-None-Match uses weak comparison, so W/ prefixes are ignored on both sides
+    if_none_match = {
+        tag.strip().removeprefix("W/")
+        for tag in request.headers.get("if-none-match", "").split(",")
+    }
+    if "*" in if_none_match or etag.removeprefix("W/") in if_none_match:
+        return Response(status_code=304, headers=headers)
+    return ORJSONResponse(content, headers=headers)
+
+
+# Only the fields the chat list renders; clerk_id is always the caller's own
+_PROJECT_CHATS_QUERY = """
+query ProjectChats($projectId: UUID!, $clerkId: String!) {
+  chatsCollection(
+    filter: {project_id: {eq: $projectId}, clerk_id: {eq: $clerkId}}
+    orderBy: [{created_at: DescNullsLast}]
+  ) {
+    edges { node { id title project_id created_at } }
+  }
+}
+"""
+
 @app.get("/api/projects/{project_id}/chats")
 async def get_project_chats(
     project_id: str, 
-    clerk_id: str = Depends(get_current_user)
+    request: Request,
+    clerk_id: str = Depends(get_current_user),
+    http: httpx.AsyncClient = Depends(get_http)
 ):
     """
     Retrieve all chats for a specific project
     """
     try:
-        result = supabase.table("chats").select("*").eq("project_id", project_id).eq("clerk_id", clerk_id).order("created_at", desc=True).execute()
-
-        return {
+        cached = _chats_cache.get((project_id, clerk_id))
+        if cached is None:
+            data = await supabase_graphql(http, _PROJECT_CHATS_QUERY, {
+                "projectId": project_id,
+                "clerkId": clerk_id
+            })
+            chats = [edge["node"] for edge in data["chatsCollection"]["edges"]]
+            cached = _chats_cache[(project_id, clerk_id)] = (_etag(orjson.dumps(chats)), chats)
+
+        etag, chats = cached
+        return _etag_response(request, etag, {
             "success": True,
             "message": "Project chats retrieved successfully", 
-            "data": result.data or []
-        }
+            "data": chats
+        })
 
     except Exception as e:
         raise HTTPException(
@@ -395,25 +537,41 @@ async def get_project_chats(
 @app.get("/api/projects/{project_id}/settings")
 async def get_project_settings(
     project_id: str, 
-    clerk_id: str = Depends(get_current_user)
+    request: Request,
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)
 ):
     """
     Retrieve settings for a specific project
     """
     try:
-        settings_result = supabase.table("project_settings").select("*").eq("project_id", project_id).execute()
-
-        if not settings_result.data:
-            raise HTTPException(
-                status_code=404, 
-                detail="Project settings not found"
+        cached = _settings_cache.get((project_id, clerk_id))
+        if cached is None:
+            # Empty inner embed filters on the owning project without returning it
+            settings_result = await (
+                db.table("project_settings")
+                .select("*, projects!inner()")
+                .eq("project_id", project_id)
+                .eq("projects.clerk_id", clerk_id)
+                .execute()
             )
 
-        return {
+            if not settings_result.data:
+                raise HTTPException(
+                    status_code=404, 
+                    detail="Project settings not found"
+                )
+
+            project_settings = settings_result.data[0]
+            etag = _etag(f"{project_id}:{project_settings['updated_at']}".encode())
+            cached = _settings_cache[(project_id, clerk_id)] = (etag, project_settings)
+
+        etag, project_settings = cached
+        return _etag_response(request, etag, {
             "success": True,
             "message": "Project settings retrieved successfully", 
-            "data": settings_result.data[0]
-        }
+            "data": project_settings
+        })
 
     except HTTPException:
         raise
@@ -426,11 +584,12 @@ async def get_project_settings(
 @app.get("/api/projects/{project_id}/files")
 async def get_project_files(
     project_id: str, 
-    clerk_id: str = Depends(get_current_user)
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)
 ):
     try:
         # Get all files for this project - FK constraints ensure project exists and belongs to the user
-        result = supabase.table("project_documents").select("*").eq("project_id", project_id).eq("clerk_id", clerk_id).order("created_at", desc=True).execute()
+        result = await db.table("project_documents").select("*").eq("project_id", project_id).eq("clerk_id", clerk_id).order("created_at", desc=True).execute()
 
         return {
             "message": "Project files retrieved successfully", 
@@ -445,92 +604,77 @@ class ChatCreate(BaseModel):
     project_id: str
 
 
-@app.post("/api/chats")
+@app.post("/api/chats", response_class=ORJSONResponse)
 async def create_chat(
     chat: ChatCreate, 
-    clerk_id: str = Depends(get_current_user)
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)
 ):
     try:
-        result = supabase.table("chats").insert({
+        result = await db.table("chats").insert({
             "title": chat.title, 
             "project_id": chat.project_id, 
             "clerk_id": clerk_id
         }).execute()
+        _chats_cache.pop((chat.project_id, clerk_id), None)
 
-        return {
+        return ORJSONResponse({
             "message": "Chat created successfully", 
             "data": result.data[0]
-        }
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail = f"Failed to create chat: {str(e)}")
 
 
-@app.delete("/api/chats/{chat_id}")
+@app.delete("/api/chats/{chat_id}", response_class=ORJSONResponse)
 async def delete_chat(
     chat_id: str, 
-    clerk_id: str = Depends(get_current_user)
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)
 ):
     try:
-        deleted_result = supabase.table("chats").delete().eq("id", chat_id).eq("clerk_id", clerk_id).execute()
+        deleted_result = await db.table("chats").delete().eq("id", chat_id).eq("clerk_id", clerk_id).execute()
 
         if not deleted_result.data: 
             raise HTTPException(status_code=404, detail="Chat not found or access denied")
+        _chats_cache.pop((deleted_result.data[0]["project_id"], clerk_id), None)
 
-        return {
+        return ORJSONResponse({
             "message": "Chat Deleted Successfully", 
             "data": deleted_result.data[0]
-        }
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail = f"Failed to delete chat: chat_id")
 
-@app.get("/api/projects/{project_id}/settings")
-async def get_project_settings(
-    project_id: str, 
-    clerk_id: str = Depends(get_current_user)
-):
-
-    try: 
-       
-        settings_result = supabase.table("project_settings").select("*").eq("project_id", project_id).execute()
-
-        if not settings_result.data:
-            raise HTTPException(status_code=404, detail="Project settings not found")
-
-        return {
-            "message": "Project settings retrieved successfully", 
-            "data": settings_result.data[0]
-        }
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail = f"Failed to get project settings: {str(e)}")
-
-
-@app.put("/api/projects/{project_id}/settings")
+@app.put("/api/projects/{project_id}/settings", response_class=ORJSONResponse)
 async def update_project_settings(
     project_id: str, 
     settings: ProjectSettings, 
-    clerk_id: str = Depends(get_current_user)
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)
 ): 
     try: 
-        # First verify the project exists and belongs to the user
-        project_result = supabase.table("projects").select("id").eq("id", project_id).eq("clerk_id", clerk_id).execute()    
-
-        if not project_result.data:
-            raise HTTPException(status_code=404, detail = f"Project not found or access denied")
-
-        # Perform the update
-        result = supabase.table("project_settings").update(settings.model_dump()).eq("project_id", project_id).execute()
+        # Ownership check and update run as one statement; no row back means
+        # the project doesn't exist or belongs to someone else
+        result = await db.rpc("update_project_settings_for_owner", {
+            "_project_id": project_id,
+            "_clerk_id": clerk_id,
+            "_settings": settings.model_dump()
+        }).execute()
 
         if not result.data:
-            raise HTTPException(status_code=404, detail = f"Project settings not found")
+            raise HTTPException(status_code=404, detail = f"Project not found or access denied")
+        _settings_cache.pop((project_id, clerk_id), None)
 
-        return {
+        return ORJSONResponse({
             "message": "Project settings updated successfully", 
             "data": result.data[0]
-        }
+        })
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail = f"Failed to update project settings: {str(e)}")
 
@@ -542,19 +686,21 @@ class FileUploadRequest(BaseModel):
     file_type: str = Field(..., description="The type of the file")
     file_size: int = Field(..., description="The size of the file")
 
-@app.post("/api/projects/{project_id}/files/upload-url")
+@app.post("/api/projects/{project_id}/files/upload-url", response_class=ORJSONResponse)
 async def get_upload_presigned_url(
     project_id: str,
     file_request: FileUploadRequest,
-    clerk_id: str = Depends(get_current_user)):
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)):
 
     try:
         # Verify project exists and belongs to the current user
-        project_result = (
-            supabase.table("projects")
+        project_result = await (
+            db.table("projects")
             .select("id")
             .eq("id", project_id)
             .eq("clerk_id", clerk_id)
+            .limit(1)
             .execute())
         
 
@@ -595,8 +741,8 @@ async def get_upload_presigned_url(
             )
 
         # Generate database record with pending status
-        document_creation_result = (
-            supabase.table("project_documents")
+        document_creation_result = await (
+            db.table("project_documents")
             .insert(
                 {
                     "project_id": project_id,
@@ -617,14 +763,14 @@ async def get_upload_presigned_url(
                 detail="Failed to create project document - invalid data provided",
             )
 
-        return {
+        return ORJSONResponse({
             "message": "Upload presigned url generated successfully",
             "data": {
                 "upload_url": presigned_url,
                 "s3_key": s3_key,
                 "document": document_creation_result.data[0],
             }
-        }
+        })
 
     except HTTPException as e:
         raise e
@@ -634,11 +780,12 @@ async def get_upload_presigned_url(
             status_code=500,
             detail=f"An internal server error occurred while generating upload presigned url for {project_id}: {str(e)}",
         )
-@app.post("/api/projects/{project_id}/files/confirm")
+@app.post("/api/projects/{project_id}/files/confirm", response_class=ORJSONResponse)
 async def confirm_file_upload(
     project_id: str, 
     confirm_request: dict, 
-    clerk_id: str = Depends(get_current_user)
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)
 ):
     try:
         s3_key = confirm_request.get("s3_key")
@@ -647,7 +794,7 @@ async def confirm_file_upload(
             raise HTTPException(status_code=400, detail="s3_key is required")
 
         # Update document status
-        result = supabase.table("project_documents").update({
+        result = await db.table("project_documents").update({
             "processing_status": "queued"
         }).eq("s3_key", s3_key).eq("project_id", project_id).eq("clerk_id", clerk_id).execute()
 
@@ -661,10 +808,10 @@ async def confirm_file_upload(
 
 
         # Return JSON 
-        return {
+        return ORJSONResponse({
             "message": "Upload confirmed, processing started with Celery", 
             "data": document
-        }
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail = f"Failed to confirm upload: {str(e)}")
@@ -672,11 +819,12 @@ async def confirm_file_upload(
 class UrlAddRequest(BaseModel):
     url: str
 
-@app.post("/api/projects/{project_id}/urls")
+@app.post("/api/projects/{project_id}/urls", response_class=ORJSONResponse)
 async def add_website_url(
     project_id: str, 
     url_request: UrlAddRequest, 
-    clerk_id: str = Depends(get_current_user)
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)
 ):
     try:
         # Basic URL validation
@@ -686,7 +834,7 @@ async def add_website_url(
             url = "https://" + url
 
 
-        result = supabase.table("project_documents").insert({
+        result = await db.table("project_documents").insert({
             "project_id": project_id,
             'filename': url,
             's3_key': "",
@@ -707,24 +855,25 @@ async def add_website_url(
 
 
 
-        return {
+        return ORJSONResponse({
             "message": "URL added successfully, processing started", 
             "data": result.data[0]
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to add URL: {str(e)}")
 
 
-@app.delete("/api/projects/{project_id}/files/{file_id}")
+@app.delete("/api/projects/{project_id}/files/{file_id}", response_class=ORJSONResponse)
 async def delete_file(
     project_id: str, 
     file_id: str, 
-    clerk_id: str = Depends(get_current_user)
+    clerk_id: str = Depends(get_current_user),
+    db: AsyncClient = Depends(get_async_supabase)
 ):
     try:
         # Get the file record (this also verifies ownership view clerk_id)
-        file_result = supabase.table("project_documents").select("*").eq("id", file_id).eq("clerk_id", clerk_id).eq("project_id", project_id).execute()
+        file_result = await db.table("project_documents").select("s3_key").eq("id", file_id).eq("clerk_id", clerk_id).eq("project_id", project_id).execute()
 
         if not file_result.data:
             raise HTTPException(status_code=404, detail="File not found or access denied")
@@ -738,14 +887,14 @@ async def delete_file(
         if s3_key:
             try: 
                 s3_client.delete_object(Bucket=BUCKET_NAME, Key=s3_key)
-                print(f"Deleted from S3: {s3_key}")
+                logger.debug("Deleted from S3: %s", s3_key)
             except Exception as s3_error:
-                print(f"Failed to delete from S3: {s3_error}")
+                logger.warning("Failed to delete from S3: %s", s3_error)
 
 
         # Delete document record from DB 
-        delete_result = (
-            supabase.table("project_documents")
+        delete_result = await (
+            db.table("project_documents")
             .delete()
             .eq("id", file_id)
             .execute()
@@ -754,10 +903,10 @@ async def delete_file(
         if not  delete_result.data:
             raise HTTPException(status_code=500, detail="Failed to delete file")
         
-        return {
+        return ORJSONResponse({
             "message": "File deleted successfully", 
             "data": delete_result.data[0]
-        }    
+        })
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to delete file: {str(e)}")
@@ -765,4 +914,12 @@ async def delete_file(
 
 
 if __name__ == "__main__":
-    uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=os.cpu_count(),
+        log_level="warning",
+    )
@@ -0,0 +1,55 @@
+-- 002_create_project_with_defaults.sql
+-- Create a project together with its default settings in a single transaction
+
+CREATE OR REPLACE FUNCTION create_project_with_defaults(
+    _name TEXT,
+    _description TEXT,
+    _clerk_id TEXT
+)
+RETURNS SETOF projects
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+DECLARE
+    new_project projects;
+BEGIN
+    INSERT INTO projects (name, description, clerk_id)
+    VALUES (_name, _description, _clerk_id)
+    RETURNING * INTO new_project;
+
+    INSERT INTO project_settings (
+        project_id,
+        embedding_model,
+        rag_strategy,
+        agent_type,
+        chunks_per_search,
+        final_context_size,
+        similarity_threshold,
+        number_of_queries,
+        reranking_enabled,
+        reranking_model,
+        vector_weight,
+        keyword_weight
+    )
+    VALUES (
+        new_project.id,
+        'text-embedding-3-large',
+        'basic',
+        'agentic',
+        10,
+        5,
+        0.3,
+        5,
+        TRUE,
+        'rerank-english-v3.0',
+        0.7,
+        0.3
+    );
+
+    RETURN NEXT new_project;
+END;
+$$;
+
+-- _clerk_id is trusted, so only the API's service role may call this
+REVOKE EXECUTE ON FUNCTION create_project_with_defaults(TEXT, TEXT, TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION create_project_with_defaults(TEXT, TEXT, TEXT) TO service_role;
@@ -0,0 +1,20 @@
+-- 003_project_settings_updated_at.sql
+-- Track when project settings last changed so the API can derive ETags from it
+
+ALTER TABLE project_settings ADD COLUMN updated_at TIMESTAMPTZ DEFAULT now();
+
+CREATE OR REPLACE FUNCTION set_updated_at()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SET search_path = public
+AS $$
+BEGIN
+    NEW.updated_at = now();
+    RETURN NEW;
+END;
+$$;
+
+CREATE TRIGGER project_settings_set_updated_at
+    BEFORE UPDATE ON project_settings
+    FOR EACH ROW
+    EXECUTE FUNCTION set_updated_at();
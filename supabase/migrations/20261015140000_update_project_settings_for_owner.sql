@@ -0,0 +1,34 @@
+-- 004_update_project_settings_for_owner.sql
+-- Update project settings only when the project belongs to the caller, in one statement
+
+CREATE OR REPLACE FUNCTION update_project_settings_for_owner(
+    _project_id UUID,
+    _clerk_id TEXT,
+    _settings JSONB
+)
+RETURNS SETOF project_settings
+LANGUAGE sql
+SET search_path = public
+AS $$
+    UPDATE project_settings ps
+    SET embedding_model = s.embedding_model,
+        rag_strategy = s.rag_strategy,
+        agent_type = s.agent_type,
+        chunks_per_search = s.chunks_per_search,
+        final_context_size = s.final_context_size,
+        similarity_threshold = s.similarity_threshold,
+        number_of_queries = s.number_of_queries,
+        reranking_enabled = s.reranking_enabled,
+        reranking_model = s.reranking_model,
+        vector_weight = s.vector_weight,
+        keyword_weight = s.keyword_weight
+    FROM projects p, jsonb_populate_record(NULL::project_settings, _settings) s
+    WHERE ps.project_id = _project_id
+      AND p.id = ps.project_id
+      AND p.clerk_id = _clerk_id
+    RETURNING ps.*;
+$$;
+
+-- _clerk_id is trusted, so only the API's service role may call this
+REVOKE EXECUTE ON FUNCTION update_project_settings_for_owner(UUID, TEXT, JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION update_project_settings_for_owner(UUID, TEXT, JSONB) TO service_role;
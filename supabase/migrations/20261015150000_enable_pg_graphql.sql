@@ -0,0 +1,7 @@
+-- 005_enable_pg_graphql.sql
+-- Serve list reads through pg_graphql (/graphql/v1)
+
+CREATE EXTENSION IF NOT EXISTS pg_graphql;
+
+-- pg_graphql pages collections at 30 rows by default; the API returns whole lists
+COMMENT ON SCHEMA public IS e'@graphql({"max_rows": 1000})';